@@ -1,34 +1,322 @@
 #!/usr/bin/env python
 """使用 PAT 一键创建 GitHub 仓库并推送指定项目。"""
 import argparse
+import atexit
+import codecs
+import functools
+import itertools
 import json
 import os
 import subprocess
 import sys
-import getpass
+import threading
+import time
 from pathlib import Path
 
-import requests
+# httpx、pygit2、orjson 等较重的模块都按需导入，--dry-run 等不联网的路径不为其付出启动时间
+
+
+@functools.cache
+def get_session():
+    """所有 GitHub API 请求共用一个 HTTP/2 连接，只握手一次；首次使用时才导入 httpx。"""
+    import httpx
+
+    session = httpx.Client(
+        http2=True,
+        headers={"Accept": "application/vnd.github+json"},
+        timeout=15.0,
+    )
+    atexit.register(session.close)
+    return session
+
+
+@functools.cache
+def load_pygit2():
+    """按需导入 pygit2（会加载 libgit2），未安装时返回 None 以回退到 git 命令行。"""
+    try:
+        import pygit2  # type: ignore
+    except ImportError:
+        return None
+    return pygit2
+
+
+@functools.cache
+def load_orjson():
+    """按需导入 orjson，未安装时返回 None 以回退到标准库 json。"""
+    try:
+        import orjson  # type: ignore
+    except ImportError:
+        return None
+    return orjson
+
+
+RATE_LIMIT_MAX_WAIT = 60
+
+
+def json_dumps(data):
+    """序列化为 UTF-8 bytes，安装了 orjson 时直接由其输出 bytes。"""
+    orjson = load_orjson()
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode("utf-8")
+
+
+def json_loads(raw):
+    """解析 bytes 形式的 JSON 响应体。"""
+    orjson = load_orjson()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def is_graphql_rate_limited(resp):
+    """GraphQL 的主限流以 HTTP 200 返回，errors 中带 type 为 RATE_LIMITED 的错误。"""
+    if b"RATE_LIMITED" not in resp.content:
+        return False
+    try:
+        data = json_loads(resp.content)
+    except ValueError:
+        return False
+    errors = data.get("errors") if isinstance(data, dict) else None
+    return isinstance(errors, list) and any(
+        isinstance(err, dict) and err.get("type") == "RATE_LIMITED" for err in errors
+    )
+
+
+def rate_limit_wait(resp):
+    """根据限流响应头计算重试前需等待的秒数，不是限流响应时返回 None。"""
+    if resp.status_code == 200:
+        # 正常的 200 不重试，只处理 GraphQL 的限流错误
+        if not is_graphql_rate_limited(resp):
+            return None
+    elif resp.status_code not in (403, 429):
+        return None
+    retry_after = resp.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        return int(retry_after)
+    reset = resp.headers.get("X-RateLimit-Reset")
+    if resp.headers.get("X-RateLimit-Remaining") == "0" and reset and reset.isdigit():
+        return max(0.0, int(reset) - time.time())
+    return None
+
+
+def gh_request(method, url, **kwargs):
+    """发送 GitHub API 请求；被限流且等待时间不长时按响应头等待后重试一次。"""
+    session = get_session()
+    resp = session.request(method, url, **kwargs)
+    wait = rate_limit_wait(resp)
+    if wait is None or wait > RATE_LIMIT_MAX_WAIT:
+        return resp
+    sys.stderr.write(f"警告：触发 GitHub 限流，{wait:.0f} 秒后重试。\n")
+    time.sleep(wait)
+    return session.request(method, url, **kwargs)
+
+
+def git_spawn_options():
+    """git 子进程的公共启动参数，run_git 与 run_cmd_stream 共用。
+
+    GIT_OPTIONAL_LOCKS=0 让 status 等只读查询不去抢 index.lock 回写；
+    POSIX 上 Python 创建的 fd 默认不可继承，close_fds=False 可省去逐个关闭 fd 的开销。
+    """
+    return {
+        "env": {**os.environ, "GIT_OPTIONAL_LOCKS": "0"},
+        "close_fds": os.name == "nt",
+    }
+
+
+def run_git(cmd, cwd, **kwargs):
+    """启动 git 子进程，返回 CompletedProcess，不检查退出码。"""
+    return subprocess.run(cmd, cwd=cwd, **git_spawn_options(), **kwargs)
+
+
+def run_cmd_stream(cmd, cwd, keep=None):
+    """运行耗时命令（如 git push），把输出原样分块转发到 stderr 而不是整体缓存。
+
+    git 的进度用 \r 原地刷新，转发时保留 \r；仅按 \n 切行交给 keep，
+    只保留 keep(line) 为真的行并返回；失败时抛出异常，异常信息附带这些行。
+    """
+    import locale
+
+    kept = []
+    pending = ""
+    decoder = codecs.getincrementaldecoder(locale.getpreferredencoding(False))("replace")
+    with subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        **git_spawn_options(),
+    ) as proc:
+        while True:
+            chunk = proc.stdout.read1(8192)
+            if not chunk:
+                break
+            text = decoder.decode(chunk)
+            sys.stderr.write(text)
+            sys.stderr.flush()
+            if keep is None:
+                continue
+            *lines, pending = (pending + text).split("\n")
+            for line in lines:
+                # 一行里被 \r 覆盖过的进度只看最后可见的部分
+                line = line.rstrip("\r").rsplit("\r", 1)[-1]
+                if keep(line):
+                    kept.append(line)
+    if proc.returncode != 0:
+        detail = "".join(f"\n{line}" for line in kept)
+        raise RuntimeError(f"命令失败（退出码 {proc.returncode}）: {' '.join(cmd)}{detail}")
+    return kept
+
+
+# git push --porcelain 每个 ref 一行："<标记>\t<本地>:<远程>\t<摘要>"
+PUSH_FLAGS = {
+    " ": "快进",
+    "+": "强制更新",
+    "-": "已删除",
+    "*": "新建",
+    "=": "无变化",
+    "!": "被拒绝",
+}
+
+
+def is_push_ref_line(line):
+    """判断是否为 git push --porcelain 输出的 ref 状态行。"""
+    return len(line) > 2 and line[0] in PUSH_FLAGS and line[1] == "\t"
+
+
+def push_refs(root, remote_name, refspecs):
+    """用一次 git push --atomic --porcelain 推送多个 ref，返回 [(状态, ref, 摘要)]。
+
+    --atomic 保证这些 ref 要么全部更新要么全部不变，被拒绝时异常信息里带有各 ref 的状态行。
+    """
+    # 推送仍交给 git 命令行，以沿用用户已配置的凭据管理器（--skip-create 时没有 token）
+    cmd = ["git", "push", "--atomic", "--porcelain", "-u", remote_name, *refspecs]
+    if sys.stderr.isatty():
+        # 输出经管道转发时 git 默认不显示进度，终端下显式打开；写日志时不开，避免进度行刷屏
+        cmd.insert(2, "--progress")
+    results = []
+    for line in run_cmd_stream(cmd, root, keep=is_push_ref_line):
+        flag, ref, summary = (line.split("\t") + [""])[:3]
+        results.append((PUSH_FLAGS[flag], ref, summary))
+    return results
 
 
 def run_cmd(cmd, cwd):
     """运行命令并在失败时抛出异常，便于脚本中统一处理。"""
-    result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True)
+    result = run_git(cmd, cwd, capture_output=True, text=True)
     if result.returncode != 0:
         raise RuntimeError(f"命令失败: {' '.join(cmd)}\nstdout: {result.stdout}\nstderr: {result.stderr}")
     return result.stdout.strip()
 
 
+CACHE_DIR = Path.home() / ".cache" / "push_to_github"
+LOGIN_CACHE_TTL = 24 * 3600
+
+
+def read_json_cache(name, max_age):
+    """读取缓存目录下的 JSON 文件，不存在、过期或损坏时返回 None。"""
+    path = CACHE_DIR / name
+    try:
+        if time.time() - path.stat().st_mtime > max_age:
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def write_json_cache(name, data):
+    """原子写入缓存文件（先写临时文件再 os.replace），写入失败不影响主流程。"""
+    import tempfile
+
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, CACHE_DIR / name)
+    except (OSError, TypeError, ValueError):
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+@functools.cache
+def resolve_absolute_root(path):
+    """解析绝对路径形式的项目根路径，结果按参数缓存，被其他脚本反复调用时不再逐级 lstat。"""
+    return Path(path).resolve()
+
+
+def resolve_root(path):
+    """解析 --path 指定的项目根路径。
+
+    相对路径依赖当前目录，调用方切换目录后缓存会指向错误的项目，因此只缓存绝对路径。
+    """
+    if os.path.isabs(path):
+        return resolve_absolute_root(path)
+    return Path(path).resolve()
+
+
+def open_repo(root):
+    """安装了 pygit2 时在进程内打开仓库，否则返回 None 以走 git 命令行。"""
+    pygit2 = load_pygit2()
+    if pygit2 is None:
+        return None
+    try:
+        return pygit2.Repository(str(root))
+    except pygit2.GitError:
+        # libgit2 打不开的仓库（不支持的扩展、safe.directory 归属检查等）交给 git 命令行处理
+        return None
+
+
 def ensure_git_repo(root):
     """确保存在 Git 仓库，没有则初始化。"""
-    if not (root / ".git").exists():
-        run_cmd(["git", "init"], root)
+    try:
+        os.stat(os.path.join(root, ".git"))
+        return
+    except FileNotFoundError:
+        pass
+    # 一次性操作，始终交给 git init：libgit2 默认不使用 init.templateDir 等配置，会漏装模板里的 hooks
+    run_cmd(["git", "init"], root)
+
+
+def show_untracked_files(value):
+    """按 git 的规则判断 status.showUntrackedFiles 配置是否要求列出未跟踪文件。"""
+    return (value or "").strip().lower() not in ("no", "false", "off", "0")
+
+
+def worktree_is_dirty(root):
+    """用退出码判断是否有改动，干净仓库上不会经管道传回任何内容。"""
+    diff = run_git(["git", "diff", "--quiet", "HEAD", "--"], root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if diff.returncode == 1:
+        return True
+    if diff.returncode != 0:
+        # 还没有任何提交（HEAD 不存在），退回完整的 status 检查
+        return bool(run_cmd(["git", "status", "--porcelain"], root))
+    # 与 git status 一致：配置了 status.showUntrackedFiles=no 时不把未跟踪文件算作改动
+    config = run_git(["git", "config", "--get", "status.showUntrackedFiles"], root, capture_output=True, text=True)
+    if not show_untracked_files(config.stdout):
+        return False
+    return bool(run_cmd(["git", "ls-files", "--others", "--exclude-standard", "-z"], root))
 
 
 def ensure_clean_tree(root):
     """推送前必须保证工作区干净。"""
-    status = run_cmd(["git", "status", "--porcelain"], root)
-    if status:
+    repo = open_repo(root)
+    if repo is not None:
+        try:
+            untracked = show_untracked_files(repo.config["status.showUntrackedFiles"])
+        except KeyError:
+            untracked = True
+        status = repo.status(untracked_files="all" if untracked else "no")
+        # 忽略文件不算改动，其余任何状态位都视为未提交
+        dirty = any(flags & ~load_pygit2().GIT_STATUS_IGNORED for flags in status.values())
+    else:
+        dirty = worktree_is_dirty(root)
+    if dirty:
         raise RuntimeError("工作区存在未提交改动，请先提交后再运行脚本。")
 
 def try_load_shared_env():
@@ -42,8 +330,76 @@ def try_load_shared_env():
         return False
 
 
+def gh_config_dir():
+    """按 gh 的规则定位其配置目录。"""
+    if os.environ.get("GH_CONFIG_DIR"):
+        return Path(os.environ["GH_CONFIG_DIR"])
+    if os.environ.get("XDG_CONFIG_HOME"):
+        return Path(os.environ["XDG_CONFIG_HOME"]) / "gh"
+    if os.name == "nt" and os.environ.get("AppData"):
+        return Path(os.environ["AppData"]) / "GitHub CLI"
+    return Path.home() / ".config" / "gh"
+
+
+def gh_host():
+    """gh 当前使用的主机名。"""
+    return os.environ.get("GH_HOST") or "github.com"
+
+
+def read_token_from_gh_env():
+    """按 gh auth token 的优先级读取环境变量中的 token，未设置时返回 None。"""
+    if gh_host() == "github.com":
+        names = ("GH_TOKEN", "GITHUB_TOKEN")
+    else:
+        names = ("GH_ENTERPRISE_TOKEN", "GITHUB_ENTERPRISE_TOKEN")
+    for name in names:
+        token = (os.environ.get(name) or "").strip()
+        if token:
+            return token
+    return None
+
+
+def read_token_from_gh_hosts():
+    """直接读取 gh 的 hosts.yml 中明文保存的 token。
+
+    token 存在系统钥匙串、未安装 PyYAML 或文件结构不符合预期时返回 None。
+    """
+    path = gh_config_dir() / "hosts.yml"
+    try:
+        text = path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+    try:
+        import yaml  # type: ignore
+
+        hosts = yaml.safe_load(text)
+    except Exception:
+        return None
+    if not isinstance(hosts, dict):
+        return None
+    host = hosts.get(gh_host())
+    if not isinstance(host, dict):
+        return None
+    token = host.get("oauth_token")
+    if not token:
+        # 新版 gh 支持多账号，明文 token 记在 users.<当前用户> 下
+        users = host.get("users")
+        user = users.get(host.get("user")) if isinstance(users, dict) else None
+        token = user.get("oauth_token") if isinstance(user, dict) else None
+    if not isinstance(token, str):
+        return None
+    return token.strip() or None
+
+
 def try_get_token_from_gh():
-    """尝试从 GitHub CLI 获取当前登录的 token（如果安装了 gh 且已登录）。"""
+    """尝试从 GitHub CLI 获取当前登录的 token（如果安装了 gh 且已登录）。
+
+    与 gh auth token 一致，环境变量中的 GH_TOKEN 等优先；其次直接读 gh 的配置文件，
+    省去启动 gh 进程；都读不到时再执行 gh auth token。
+    """
+    token = read_token_from_gh_env() or read_token_from_gh_hosts()
+    if token:
+        return token
     try:
         result = subprocess.run(["gh", "auth", "token"], capture_output=True, text=True)
         if result.returncode != 0:
@@ -54,14 +410,43 @@ def try_get_token_from_gh():
         return None
 
 
-def get_github_token(allow_prompt):
-    """获取 GitHub PAT，优先环境变量，其次共享 .env，其次 gh，最后可交互提示。"""
-    token = (os.environ.get("GITHUB_TOKEN") or "").strip()
+_POOL_ITER = None
+
+
+def next_pooled_token(persist=True):
+    """从 GITHUB_TOKENS（逗号分隔）中轮询取一个 token，未配置时返回 None。
+
+    下一次的索引写入缓存目录，连续多次运行脚本也会依次轮换而不是总用第一个；
+    persist=False（如 dry-run）时不写入，不占用轮换位置。
+    池中的 PAT 必须属于同一账号，否则仓库 owner 会随所选 token 变化。
+    """
+    global _POOL_ITER
+    if _POOL_ITER is None:
+        pool = [t.strip() for t in os.environ.get("GITHUB_TOKENS", "").split(",") if t.strip()]
+        if not pool:
+            return None
+        start = read_json_cache("pool.idx", float("inf"))
+        start = start % len(pool) if isinstance(start, int) else 0
+        _POOL_ITER = itertools.islice(itertools.cycle(enumerate(pool)), start, None)
+    index, token = next(_POOL_ITER)
+    if persist:
+        write_json_cache("pool.idx", index + 1)
+    return token
+
+
+def env_github_token(persist=True):
+    """只从 token 池与 GITHUB_TOKEN 环境变量取 token，不加载 .env、不启动 gh。"""
+    return next_pooled_token(persist) or (os.environ.get("GITHUB_TOKEN") or "").strip() or None
+
+
+def find_github_token(persist=True):
+    """非交互地查找 GitHub PAT：token 池、环境变量、共享 .env、gh，找不到返回 None。"""
+    token = env_github_token(persist)
     if token:
         return token
 
     try_load_shared_env()
-    token = (os.environ.get("GITHUB_TOKEN") or "").strip()
+    token = env_github_token(persist)
     if token:
         return token
 
@@ -69,8 +454,14 @@ def get_github_token(allow_prompt):
     if token:
         os.environ["GITHUB_TOKEN"] = token
         return token
+    return None
 
+
+def prompt_github_token(allow_prompt):
+    """查找失败后的兜底：可交互时提示输入 PAT，否则报错。"""
     if allow_prompt and sys.stdin.isatty():
+        import getpass
+
         token = (getpass.getpass("请输入 GitHub PAT（不会回显）：") or "").strip()
         if token:
             os.environ["GITHUB_TOKEN"] = token
@@ -79,49 +470,124 @@ def get_github_token(allow_prompt):
     raise RuntimeError("未检测到 GITHUB_TOKEN，请先导出 PAT：setx GITHUB_TOKEN <token>（必要时重启资源管理器）")
 
 
+def get_github_token(allow_prompt, persist=True):
+    """获取 GitHub PAT，优先 token 池与环境变量，其次共享 .env，其次 gh，最后可交互提示。"""
+    return find_github_token(persist) or prompt_github_token(allow_prompt)
+
+
+def preflight(root):
+    """工作区检查与较慢的 token 查找（共享 .env、gh）互不依赖，用一个线程并发执行，返回找到的 token 或 None。
+
+    创建仓库不参与并发：工作区不干净时不应在 GitHub 上留下空仓库。
+    """
+    found = []
+    worker = threading.Thread(target=lambda: found.append(find_github_token()), daemon=True)
+    worker.start()
+    ensure_clean_tree(root)
+    worker.join()
+    return found[0] if found else None
+
+
+def get_configured_login():
+    """读取 git 全局配置 github.user（常见的 GitHub 用户名约定），未设置时返回 None。"""
+    result = run_git(["git", "config", "--global", "github.user"], None, capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
 def get_authed_login(token):
-    """通过 GitHub API 获取当前 token 对应的用户名。"""
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
+    """获取当前 token 对应的用户名：优先使用 git 配置的 github.user，其次按 token 查询。"""
+    return get_configured_login() or lookup_token_login(token)
+
+
+@functools.lru_cache(maxsize=8)
+def lookup_token_login(token):
+    """按 token 查询用户名：先读本地缓存（按 token 哈希，每条 24 小时），最后才请求 GitHub API。"""
+    import hashlib
+
+    key = hashlib.sha256(token.encode()).hexdigest()[:16]
+    now = time.time()
+    cache = read_json_cache("login.json", float("inf"))
+    # 每条记录为 [login, 写入时间]，逐条判断过期，避免别的 token 写入时刷新整个文件的 mtime
+    cache = {
+        k: v
+        for k, v in (cache.items() if isinstance(cache, dict) else ())
+        if isinstance(v, list)
+        and len(v) == 2
+        and isinstance(v[0], str)
+        and isinstance(v[1], (int, float))
+        and now - v[1] <= LOGIN_CACHE_TTL
     }
-    resp = requests.get("https://api.github.com/user", headers=headers, timeout=15)
+    if key in cache:
+        return cache[key][0]
+
+    headers = {"Authorization": f"Bearer {token}"}
+    resp = gh_request("GET", "https://api.github.com/user", headers=headers)
     if resp.status_code != 200:
         raise RuntimeError(f"获取当前用户信息失败，状态码 {resp.status_code}: {resp.text}")
-    data = resp.json()
+    data = json_loads(resp.content)
     login = (data.get("login") or "").strip()
     if not login:
         raise RuntimeError("获取当前用户信息失败：返回缺少 login")
+
+    cache[key] = [login, now]
+    write_json_cache("login.json", cache)
     return login
 
 
+GRAPHQL_URL = "https://api.github.com/graphql"
+
+# 创建仓库并在同一次往返中取回 clone 地址与 owner，无需再请求 /user
+CREATE_REPO_MUTATION = """
+mutation($name: String!, $visibility: RepositoryVisibility!, $description: String) {
+  createRepository(input: {name: $name, visibility: $visibility, description: $description}) {
+    repository { url owner { login } }
+  }
+}
+"""
+
+
 def create_repo(token, name, private, description):
-    """调用 GitHub API 创建仓库，成功返回仓库信息，已存在时返回 None。"""
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-    }
+    """调用 GitHub GraphQL API 创建仓库，成功返回仓库信息（url、owner.login），已存在时返回 None。"""
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
     payload = {
-        "name": name,
-        "private": private,
-        "description": description or "",
+        "query": CREATE_REPO_MUTATION,
+        "variables": {
+            "name": name,
+            "visibility": "PRIVATE" if private else "PUBLIC",
+            "description": description or "",
+        },
     }
-    resp = requests.post("https://api.github.com/user/repos", headers=headers, json=payload, timeout=15)
-    if resp.status_code == 201:
-        return resp.json()
-    if resp.status_code == 422:
-        # 仓库已存在等情况，调用者可选择跳过创建
-        sys.stderr.write(f"警告：仓库可能已存在，跳过创建。响应: {resp.text}\n")
-        return None
-    raise RuntimeError(f"创建仓库失败，状态码 {resp.status_code}: {resp.text}")
+    resp = gh_request("POST", GRAPHQL_URL, headers=headers, content=json_dumps(payload))
+    if resp.status_code != 200:
+        raise RuntimeError(f"创建仓库失败，状态码 {resp.status_code}: {resp.text}")
+    data = json_loads(resp.content)
+    errors = data.get("errors") or []
+    if errors:
+        if any(err.get("type") == "UNPROCESSABLE" or "already exists" in (err.get("message") or "") for err in errors):
+            # 仓库已存在等情况（对应 REST 的 422），调用者可选择跳过创建
+            sys.stderr.write(f"警告：仓库可能已存在，跳过创建。响应: {resp.text}\n")
+            return None
+        raise RuntimeError(f"创建仓库失败: {resp.text}")
+    repo = ((data.get("data") or {}).get("createRepository") or {}).get("repository")
+    if not repo:
+        raise RuntimeError(f"创建仓库失败：返回缺少 repository: {resp.text}")
+    return repo
 
 
 def set_remote(root, remote_name, remote_url):
     """设置或更新远程地址。"""
-    remotes = run_cmd(["git", "remote"], root).splitlines()
-    if remote_name in remotes:
-        run_cmd(["git", "remote", "set-url", remote_name, remote_url], root)
-    else:
+    repo = open_repo(root)
+    if repo is not None:
+        # libgit2 的 set_url 不校验远程是否存在，进程内查询也没有额外开销，这里保留判断
+        if remote_name in repo.remotes.names():
+            repo.remotes.set_url(remote_name, remote_url)
+        else:
+            repo.remotes.create(remote_name, remote_url)
+        return
+
+    # 常见情况是远程已存在，直接 set-url 只需一个子进程；失败（远程不存在）再 add
+    result = run_git(["git", "remote", "set-url", remote_name, remote_url], root, capture_output=True)
+    if result.returncode != 0:
         run_cmd(["git", "remote", "add", remote_name, remote_url], root)
 
 
@@ -139,49 +605,63 @@ def main():
     parser.add_argument("--no-prompt-token", action="store_true", help="缺少 token 时不提示输入（直接报错）")
     args = parser.parse_args()
 
-    root = Path(args.path).resolve() if args.path else Path.cwd()
+    # 当前目录可能被调用方切换，Path.cwd() 只是一次 getcwd，不做缓存
+    root = resolve_root(args.path) if args.path else Path.cwd()
     repo_name = args.repo or root.name
 
-    token = None
-    if not args.skip_create:
-        need_token = (not args.dry_run) or (args.owner is None)
-        if need_token:
-            token = get_github_token(allow_prompt=(not args.no_prompt_token))
-
-    ensure_git_repo(root)
-
     owner = args.owner
     if args.dry_run:
-        if not owner and token:
-            owner = get_authed_login(token)
+        # dry-run 只打印计划：不初始化仓库，能从 --owner / github.user 得到 owner 时也不取 token、不联网
         if not owner:
-            raise RuntimeError("dry-run 模式下需要提供 --owner，或提供 GITHUB_TOKEN 以自动获取用户名。")
+            owner = get_configured_login()
+        if not owner and not args.skip_create:
+            # github.user 刚读过为空，直接按 token 查询，不再重复执行 git config
+            # dry-run 不创建任何东西，不推进 token 池的轮换位置
+            token = get_github_token(allow_prompt=(not args.no_prompt_token), persist=False)
+            owner = lookup_token_login(token)
+        if not owner:
+            if args.skip_create:
+                hint = "--owner 或 git config --global github.user"
+            else:
+                hint = "--owner，或提供 GITHUB_TOKEN / git config --global github.user 以自动获取用户名"
+            raise RuntimeError(f"dry-run 模式下需要提供 {hint}。")
         remote_url = f"https://github.com/{owner}/{repo_name}.git"
         print(f"计划推送到 {remote_url} 分支 {args.branch}，远程名 {args.remote_name}（dry-run 不会创建仓库/修改远程/推送）")
         return
 
-    ensure_clean_tree(root)
+    ensure_git_repo(root)
+
+    token = None
+    if not args.skip_create:
+        token = env_github_token()
+    if args.skip_create or token:
+        # 没有需要并发的慢查询时直接检查，不为线程付出额外开销
+        ensure_clean_tree(root)
+    else:
+        token = preflight(root)
 
     repo_info = None
     if not args.skip_create:
         if not token:
-            token = get_github_token(allow_prompt=(not args.no_prompt_token))
+            token = prompt_github_token(allow_prompt=(not args.no_prompt_token))
         repo_info = create_repo(token, repo_name, args.private, args.description)
 
     if repo_info:
         owner = repo_info.get("owner", {}).get("login", owner)
-        remote_url = repo_info.get("clone_url")
+        remote_url = f"{repo_info['url']}.git"
     else:
-        if not owner and token:
-            owner = get_authed_login(token)
+        if not owner:
+            owner = get_authed_login(token) if token else get_configured_login()
         if not owner:
             raise RuntimeError("未提供 owner 且未从创建结果中获取到 owner，无法拼接远程地址。")
         remote_url = f"https://github.com/{owner}/{repo_name}.git"
 
     set_remote(root, args.remote_name, remote_url)
 
-    run_cmd(["git", "push", "-u", args.remote_name, args.branch], root)
+    results = push_refs(root, args.remote_name, [f"refs/heads/{args.branch}"])
     print(f"推送完成：{remote_url} -> {args.branch}")
+    for status, ref, summary in results:
+        print(f"  [{status}] {ref} {summary}".rstrip())
 
 
 if __name__ == "__main__":
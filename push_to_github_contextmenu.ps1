@@ -110,9 +110,9 @@ try {
     } catch { }
 
     # 4) 创建 GitHub 私有仓库并推送（仓库名=目录名）
-    if (-not $env:GITHUB_TOKEN) {
-        Write-Log "未检测到环境变量 GITHUB_TOKEN（PAT）。"
-        Write-Log "请先执行：setx GITHUB_TOKEN <你的PAT>，然后重启资源管理器（或注销重登）后再右键推送。"
+    if (-not $env:GITHUB_TOKEN -and -not $env:GITHUB_TOKENS) {
+        Write-Log "未检测到环境变量 GITHUB_TOKEN 或 GITHUB_TOKENS（PAT）。"
+        Write-Log "请先执行：setx GITHUB_TOKEN <你的PAT>（或 setx GITHUB_TOKENS <pat1>,<pat2>），然后重启资源管理器（或注销重登）后再右键推送。"
         Start-Process $logPath
         Pause-IfNeeded "按回车关闭窗口"
         exit 3